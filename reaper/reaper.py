@@ -9,21 +9,105 @@ Usage:
     python reaper.py --redis-host localhost --redis-port 6379 --forgejo-host https://git.example.com
 
 Environment variables (alternative to CLI args):
-    REDIS_HOST, REDIS_PORT, REDIS_PASSWORD, FORGEJO_HOST, FORGEJO_TOKEN
+    REDIS_HOST, REDIS_PORT, REDIS_PASSWORD, REDIS_PROTOCOL, REDIS_CLUSTER,
+    FORGEJO_HOST, FORGEJO_TOKEN
 """
 
 import argparse
+import functools
 import os
+import queue
 import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 import redis
 import requests
-from typing import Optional, Tuple, List
+from redis.cluster import RedisCluster
+from requests.adapters import HTTPAdapter
+from typing import Dict, Iterator, Optional, Set, Tuple, List
+
+# Number of stale domains deleted per pipelined round trip
+CHUNK_SIZE = 128
+
+# SCAN COUNT hint; large pages keep round trips low while each SCAN call
+# stays short enough not to block the Redis server
+SCAN_COUNT = 5000
+
+# Number of Forgejo .pages checks in flight at once
+CONCURRENCY = 32
+
+# Redis key prefix marking repositories recently confirmed to have a .pages
+# file; expires after the recheck interval
+LAST_SEEN_PREFIX = "reaper:last_seen:"
+
+# Seconds before a repository confirmed to have a .pages file is checked again
+RECHECK_INTERVAL = 24 * 60 * 60
+
+# Redis key holding the SCAN cursor a budget-limited run stopped at. Forgejo
+# usernames cannot contain '/', so the plugin's username:repository keys can
+# never collide with it
+CURSOR_KEY = "reaper/cursor"
+
+# Per-run budgets; once either is exceeded the scan stops and the next run
+# resumes from the saved cursor
+MAX_SCANNED = 50000
+MAX_WALL_SECONDS = 300
+
+# Capacity, in SCAN pages, of the queue of pages waiting to be checked and of
+# the queue of each page's stale mappings waiting to be deleted
+PAGE_QUEUE_SIZE = 2
+
+# End-of-stream marker passed through the pipeline queues
+_DONE = object()
+
+# Atomically delete a stale domain's keys. KEYS[1] is the forward mapping and
+# ARGV[1] the username:repository it was scanned with; if the domain has been
+# re-registered since, nothing is deleted and -1 is returned. UNLINK frees
+# memory in the background; servers older than 4.0 fall back to DEL.
+REAP_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return -1
+end
+local deleted = redis.pcall('UNLINK', unpack(KEYS))
+if type(deleted) == 'table' and deleted.err then
+    deleted = redis.call('DEL', unpack(KEYS))
+end
+return deleted
+"""
+
+
+# bytes.translate table: ASCII letters, digits and '-' map to themselves, every
+# other byte (dots, underscores, ...) to '-'
+_SANITIZE_TABLE = bytes(
+    c if (c < 128 and chr(c).isalnum()) or c == ord("-") else ord("-") for c in range(256)
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def sanitize_domain_name(domain: str) -> str:
+    """Sanitize domain name for Traefik router name (matches Go implementation)."""
+    if domain.isascii():
+        return domain.encode("ascii").translate(_SANITIZE_TABLE).decode("ascii")
+    # Custom domains are stored verbatim, so non-ASCII (IDN) names keep their
+    # Unicode letters and digits, as in the Go plugin
+    return "".join(c if c.isalnum() or c == "-" else "-" for c in domain)
 
 
 class CacheReaper:
     """Cleans up stale domain mappings from Redis cache."""
 
+    # Traefik router configuration keys below traefik/http/routers/custom-{domain}
+    TRAEFIK_SUFFIXES = (
+        "/rule",
+        "/entrypoints/0",
+        "/service",
+        "/tls/certresolver",
+        "/middlewares/0",
+        "/priority",
+    )
+
     def __init__(
         self,
         redis_host: str,
@@ -32,6 +116,15 @@ class CacheReaper:
         forgejo_host: str,
         forgejo_token: Optional[str],
         dry_run: bool = False,
+        verbose: bool = False,
+        chunk_size: int = CHUNK_SIZE,
+        scan_count: int = SCAN_COUNT,
+        concurrency: int = CONCURRENCY,
+        recheck_interval: int = RECHECK_INTERVAL,
+        redis_protocol: int = 3,
+        redis_cluster: bool = False,
+        max_scanned: int = MAX_SCANNED,
+        max_wall_seconds: int = MAX_WALL_SECONDS,
     ):
         self.redis_host = redis_host
         self.redis_port = redis_port
@@ -39,32 +132,172 @@ class CacheReaper:
         self.forgejo_host = forgejo_host.rstrip("/")
         self.forgejo_token = forgejo_token
         self.dry_run = dry_run
-
-        # Connect to Redis
-        self.redis_client = redis.Redis(
+        self.verbose = verbose
+        self.chunk_size = max(1, chunk_size)
+        self.scan_count = max(1, scan_count)
+        self.concurrency = max(1, concurrency)
+        self.recheck_interval = recheck_interval
+        self.redis_cluster = redis_cluster
+        self.max_scanned = max_scanned
+        self.max_wall_seconds = max_wall_seconds
+
+        # Connect to Redis. RESP3 (Redis 6+) replies are parsed in C by
+        # hiredis when it is installed, which speeds up large SCAN/MGET pages
+        redis_class = RedisCluster if redis_cluster else redis.Redis
+        self.redis_client = redis_class(
             host=redis_host,
             port=redis_port,
             password=redis_password,
             decode_responses=True,
+            protocol=redis_protocol,
+        )
+        # A domain's keys live in different hash slots, so the multi-key reap
+        # script can only run against a single Redis server
+        self.reap_script = (
+            None if redis_cluster else self.redis_client.register_script(REAP_SCRIPT)
         )
 
-        # Setup session for Forgejo API calls
+        # Setup session for Forgejo API calls, with a connection pool large
+        # enough to keep one keep-alive connection per concurrent check
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         if forgejo_token:
             self.session.headers.update({"Authorization": f"token {forgejo_token}"})
         self.session.headers.update({"Accept": "application/json"})
+        self.head_supported = True
+
+        # Counters for the current run, shared by the producer threads
+        self.stats_lock = threading.Lock()
+
+        # Output lines are buffered and written in batches, so the hot
+        # loops don't pay for a stdout write per line
+        self.log_buffer: List[str] = []
+        self.log_lock = threading.Lock()
+
+        # .pages lookups keyed by (username, repository)
+        self.pages_cache: Dict[Tuple[str, str], Future] = {}
+        self.pages_cache_lock = threading.Lock()
+
+    def log(self, message: str):
+        """Buffer an output line until the next flush_log()."""
+        with self.log_lock:
+            self.log_buffer.append(message)
+
+    def flush_log(self):
+        """Write all buffered output lines to stdout in a single call."""
+        with self.log_lock:
+            lines, self.log_buffer = self.log_buffer, []
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
+
+    def pages_status(self, username: str, repository: str) -> Optional[int]:
+        """
+        Return the HTTP status of a repository's .pages file (200 or 404), or
+        None if Forgejo could not be asked.
+
+        Definite answers are cached per (username, repository), since several
+        custom domains often point at the same repository, and concurrent
+        lookups of the same repository share a single in-flight request.
+        """
+        cache_key = (username, repository)
+        with self.pages_cache_lock:
+            future = self.pages_cache.get(cache_key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self.pages_cache[cache_key] = future
+
+        if owner:
+            try:
+                status = self.fetch_pages_status(username, repository)
+            except Exception as e:
+                with self.pages_cache_lock:
+                    del self.pages_cache[cache_key]
+                future.set_exception(e)
+                raise
+            if status not in (200, 404):
+                # Don't cache errors, so a later lookup retries the request
+                with self.pages_cache_lock:
+                    del self.pages_cache[cache_key]
+            future.set_result(status)
+
+        return future.result()
+
+    def mark_seen(self, repos: Set[Tuple[str, str]]):
+        """
+        Remember across runs that repositories had a .pages file, for
+        recheck_interval seconds, with one pipelined round trip.
+        """
+        if not repos or self.dry_run or self.recheck_interval <= 0:
+            return
 
-    def has_pages_file(self, username: str, repository: str) -> bool:
-        """Check if a repository has a .pages file via Forgejo API."""
-        url = f"{self.forgejo_host}/api/v1/repos/{username}/{repository}/contents/.pages"
+        now = int(time.time())
+        if self.redis_cluster:
+            pipe = self.redis_client.pipeline()
+        else:
+            pipe = self.redis_client.pipeline(transaction=False)
+        for username, repository in repos:
+            pipe.set(f"{LAST_SEEN_PREFIX}{username}:{repository}", now, ex=self.recheck_interval)
 
         try:
-            response = self.session.get(url, timeout=10)
-            return response.status_code == 200
+            pipe.execute()
+        except redis.RedisError as e:
+            self.log(f"  ⚠️  Failed to record {len(repos)} repositories as seen: {e}")
+
+    def filter_recently_seen(
+        self, mappings: List[Tuple[str, str, str]]
+    ) -> List[Tuple[str, str, str]]:
+        """
+        Drop mappings whose repository was confirmed to have a .pages file by
+        a previous run within recheck_interval seconds.
+
+        Returns:
+            Mappings that still need a Forgejo check
+        """
+        if not mappings or self.recheck_interval <= 0:
+            return mappings
+
+        # Look up all last-seen markers for the page in one round trip
+        seen = self.mget(
+            [f"{LAST_SEEN_PREFIX}{username}:{repository}" for _, username, repository in mappings]
+        )
+
+        unchecked = []
+        for (domain, username, repository), last_seen in zip(mappings, seen):
+            if last_seen is None:
+                unchecked.append((domain, username, repository))
+            else:
+                self.log(
+                    f"📋 {domain} -> {username}/{repository}\n"
+                    f"  ✓ Repository recently confirmed to have .pages file"
+                )
+        return unchecked
+
+    def fetch_pages_status(self, username: str, repository: str) -> Optional[int]:
+        """Ask Forgejo for the HTTP status of a repository's .pages file, or None on error."""
+        # The API raw route serves the file from the default branch, honours
+        # the token (so a 404 is a real answer) and skips the contents API's
+        # JSON and base64 handling
+        url = f"{self.forgejo_host}/api/v1/repos/{username}/{repository}/raw/.pages"
+
+        try:
+            # HEAD skips transferring the file. Servers that don't route HEAD
+            # for this endpoint answer 405; remember that and use GET from then
+            # on, streaming so the body is never read
+            if self.head_supported:
+                response = self.session.head(url, allow_redirects=True, timeout=10)
+                if response.status_code != 405:
+                    return response.status_code
+                self.head_supported = False
+
+            with self.session.get(url, stream=True, timeout=10) as response:
+                return response.status_code
         except requests.RequestException as e:
-            print(f"  ⚠️  Error checking {username}/{repository}: {e}")
-            # On error, assume it still exists (don't delete)
-            return True
+            self.log(f"  ⚠️  Error checking {username}/{repository}: {e}")
+            return None
 
     def parse_repo_mapping(self, value: str) -> Optional[Tuple[str, str]]:
         """Parse 'username:repository' string into tuple."""
@@ -75,56 +308,351 @@ class CacheReaper:
 
     def sanitize_domain_name(self, domain: str) -> str:
         """Sanitize domain name for Traefik router name (matches Go implementation)."""
-        # Replace dots and other special characters with hyphens
-        sanitized = domain.replace(".", "-").replace("_", "-")
-        # Remove any other non-alphanumeric characters except hyphens
-        sanitized = "".join(c if c.isalnum() or c == "-" else "-" for c in sanitized)
-        return sanitized
+        return sanitize_domain_name(domain)
 
-    def delete_domain_mappings(self, domain: str, username: str, repository: str):
-        """Delete all cache entries for a domain mapping."""
-        keys_to_delete = []
+    def domain_keys(self, domain: str, username: str, repository: str) -> List[str]:
+        """Return all cache keys that belong to a domain mapping."""
+        keys = []
 
         # Forward mapping: custom_domain:domain
         forward_key = f"custom_domain:{domain}"
-        keys_to_delete.append(forward_key)
+        keys.append(forward_key)
 
         # Reverse mapping: username:repository
         reverse_key = f"{username}:{repository}"
-        keys_to_delete.append(reverse_key)
+        keys.append(reverse_key)
 
         # Traefik router configuration keys
-        sanitized_domain = self.sanitize_domain_name(domain)
-        traefik_keys = [
-            f"traefik/http/routers/custom-{sanitized_domain}/rule",
-            f"traefik/http/routers/custom-{sanitized_domain}/entrypoints/0",
-            f"traefik/http/routers/custom-{sanitized_domain}/service",
-            f"traefik/http/routers/custom-{sanitized_domain}/tls/certresolver",
-            f"traefik/http/routers/custom-{sanitized_domain}/middlewares/0",
-            f"traefik/http/routers/custom-{sanitized_domain}/priority",
+        prefix = "traefik/http/routers/custom-" + self.sanitize_domain_name(domain)
+        keys.extend(prefix + suffix for suffix in self.TRAEFIK_SUFFIXES)
+
+        return keys
+
+    def delete_domain_mappings(self, stale: List[Tuple[str, str, str]]) -> Tuple[int, int]:
+        """
+        Delete all cache entries for a batch of (domain, username, repository) mappings.
+
+        Returns:
+            Tuple of (domains deleted, domains that failed to delete)
+        """
+        batch = [
+            (domain, self.domain_keys(domain, username, repository))
+            for domain, username, repository in stale
         ]
-        keys_to_delete.extend(traefik_keys)
 
         if self.dry_run:
-            print(f"  🔍 [DRY RUN] Would delete {len(keys_to_delete)} keys:")
-            for key in keys_to_delete:
-                print(f"     - {key}")
-        else:
-            deleted_count = 0
-            for key in keys_to_delete:
-                try:
-                    if self.redis_client.delete(key) > 0:
-                        deleted_count += 1
-                        print(f"     ✓ Deleted: {key}")
-                except redis.RedisError as e:
-                    print(f"     ✗ Failed to delete {key}: {e}")
+            for domain, keys_to_delete in batch:
+                self.log(f"  🔍 [DRY RUN] {domain}: Would delete {len(keys_to_delete)} keys:")
+                for key in keys_to_delete:
+                    self.log(f"     - {key}")
+            return len(batch), 0
+
+        try:
+            results = self.unlink_keys(
+                [
+                    (f"{username}:{repository}", keys)
+                    for (_, username, repository), (_, keys) in zip(stale, batch)
+                ]
+            )
+        except redis.RedisError as e:
+            self.log(f"  ✗ Failed to delete keys for {len(batch)} domains: {e}")
+            return 0, len(batch)
+
+        deleted = 0
+        failed = 0
+        for (domain, keys_to_delete), deleted_count in zip(batch, results):
+            if isinstance(deleted_count, Exception):
+                self.log(f"  ✗ {domain}: Failed to delete keys: {deleted_count}")
+                failed += 1
+                continue
+            if deleted_count < 0:
+                self.log(f"  ⚠️  {domain}: Mapping changed since scan (skipping)")
+                continue
+
+            if self.verbose:
+                for key in keys_to_delete:
+                    self.log(f"     - {key}")
+            self.log(f"  ✓ {domain}: Deleted {deleted_count}/{len(keys_to_delete)} keys")
+            deleted += 1
+
+        return deleted, failed
+
+    def unlink_keys(self, key_groups: List[Tuple[str, List[str]]]) -> List:
+        """
+        Run the reap script for several domains in a single pipelined round trip.
+
+        Each group is (expected forward mapping value, keys to delete) with the
+        forward mapping key first.
+
+        Returns:
+            Per-group number of deleted keys (-1 if the mapping changed since it
+            was scanned), or the exception for that group
+        """
+        if self.redis_cluster:
+            return self.unlink_keys_cluster([keys for _, keys in key_groups])
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        for mapping, keys in key_groups:
+            self.reap_script(keys=keys, args=[mapping], client=pipe)
+        return pipe.execute(raise_on_error=False)
+
+    def unlink_keys_cluster(self, key_groups: List[List[str]]) -> List:
+        """
+        UNLINK several groups of keys on Redis Cluster.
+
+        Keys of one domain hash to different slots, so each key gets its own
+        UNLINK; the cluster pipeline sends one batch per node. Unlike the
+        single-server reap script this does not re-check the forward mapping.
+
+        Returns:
+            Per-group number of deleted keys, or the first exception for that group
+        """
+        pipe = self.redis_client.pipeline()
+        for keys in key_groups:
+            for key in keys:
+                pipe.unlink(key)
+        results = pipe.execute(raise_on_error=False)
+
+        grouped = []
+        offset = 0
+        for keys in key_groups:
+            group = results[offset : offset + len(keys)]
+            offset += len(keys)
+            errors = [result for result in group if isinstance(result, Exception)]
+            grouped.append(errors[0] if errors else sum(group))
+        return grouped
+
+    def mget(self, keys: List[str]) -> List[Optional[str]]:
+        """MGET that also works when the keys span several cluster hash slots."""
+        if self.redis_cluster:
+            return self.redis_client.mget_nonatomic(keys)
+        return self.redis_client.mget(keys)
+
+    def scan_clients(self) -> List[Tuple[redis.Redis, str]]:
+        """
+        Return one (client, cursor key) pair per server to SCAN: every primary
+        on a cluster. The cursor key stores where an interrupted scan resumes.
+        """
+        if self.redis_cluster:
+            return [
+                (node.redis_connection, f"{CURSOR_KEY}/{node.name}")
+                for node in self.redis_client.get_primaries()
+            ]
+        return [(self.redis_client, CURSOR_KEY)]
+
+    def budget_exceeded(self, pending: int = 0) -> bool:
+        """
+        Check whether this run has scanned max_scanned keys (counting pending
+        keys not yet handed on) or run for max_wall_seconds.
+        """
+        if self.max_scanned > 0 and self.total_domains + pending >= self.max_scanned:
+            return True
+        if self.max_wall_seconds > 0:
+            return time.monotonic() - self.start_time >= self.max_wall_seconds
+        return False
+
+    def saved_cursor(self, cursor_key: str) -> int:
+        """Return the SCAN cursor saved by a previous run, or 0 if there is none."""
+        value = self.redis_client.get(cursor_key)
+        try:
+            return int(value or 0)
+        except ValueError:
+            self.log(f"⚠️  Ignoring invalid saved cursor {value!r} in {cursor_key}")
+            return 0
+
+    def scan_pages(self, client: redis.Redis, cursor_key: str) -> Iterator[List[str]]:
+        """
+        Yield custom_domain:* keys from SCAN in pages of about scan_count keys.
+
+        The scan starts from the cursor saved by a previous run, if any. When
+        the run's budget is exhausted, the cursor after the last yielded page
+        is saved so the next run resumes there; a completed pass clears it.
+        """
+        cursor = self.saved_cursor(cursor_key)
+        if cursor:
+            self.log(f"↪️  Resuming scan from cursor {cursor}")
+
+        page = []
+        while True:
+            # TYPE string (Redis 6+) keeps other data structures sharing the
+            # prefix from being sent to the client at all
+            cursor, keys = client.scan(
+                cursor=cursor,
+                match="custom_domain:*",
+                count=self.scan_count,
+                _type="string",
+            )
+            page.extend(keys)
+
+            # Check the budget after every SCAN call, not only per full page:
+            # a sparsely matching keyspace can take many calls to fill a page
+            if cursor != 0 and self.budget_exceeded(len(page)):
+                if page:
+                    yield page
+                self.log(f"⏸️  Scan budget reached; the next run resumes from cursor {cursor}")
+                if not self.dry_run:
+                    self.redis_client.set(cursor_key, cursor)
+                return
+
+            if len(page) >= self.scan_count or cursor == 0:
+                if page:
+                    yield page
+                    page = []
+                if cursor == 0:
+                    break
+
+        if not self.dry_run:
+            self.redis_client.delete(cursor_key)
+
+    def read_mappings(self, keys: List[str]) -> Tuple[List[Tuple[str, str, str]], int]:
+        """
+        Read and parse the repository mappings for a page of custom_domain:* keys.
+
+        Returns:
+            Tuple of ((domain, username, repository) list, error_count)
+        """
+        mappings = []
+        error_count = 0
+
+        # Get all repository mappings for the page in one round trip
+        values = self.mget(keys)
+
+        for key, value in zip(keys, values):
+            # Extract domain from key (remove "custom_domain:" prefix)
+            domain = key[len("custom_domain:") :]
+
+            if not value:
+                self.log(f"⚠️  {domain}: No value found (skipping)")
+                error_count += 1
+                continue
+
+            # Parse username:repository
+            repo_tuple = self.parse_repo_mapping(value)
+            if not repo_tuple:
+                self.log(f"⚠️  {domain}: Invalid mapping format '{value}' (skipping)")
+                error_count += 1
+                continue
+
+            username, repository = repo_tuple
+            mappings.append((domain, username, repository))
+
+        return mappings, error_count
+
+    def queue_put(self, q: queue.Queue, item) -> bool:
+        """Put an item on a pipeline queue, giving up once the run is aborted."""
+        while not self.abort.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def queue_get(self, q: queue.Queue):
+        """Get an item from a pipeline queue, returning _DONE once the run is aborted."""
+        while not self.abort.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def run_stage(self, target, *args):
+        """Run a pipeline stage, recording the first failure and aborting the others."""
+        try:
+            target(*args)
+        except BaseException as e:
+            if self.stage_error is None:
+                self.stage_error = e
+            self.abort.set()
+
+    def produce_mappings(self, client: redis.Redis, cursor_key: str, pages: queue.Queue):
+        """Producer stage: SCAN and MGET one server's custom domain mappings onto the pages queue."""
+        for keys in self.scan_pages(client, cursor_key):
+            page_mappings, errors = self.read_mappings(keys)
+            with self.stats_lock:
+                self.total_domains += len(keys)
+                self.error_count += errors
+            page_mappings = self.filter_recently_seen(page_mappings)
+
+            if page_mappings and not self.queue_put(pages, page_mappings):
+                return
+
+    def check_mappings(
+        self, pages: queue.Queue, stale: queue.Queue, executor: ThreadPoolExecutor
+    ):
+        """Checker stage: check each page's .pages files concurrently and pass stale mappings on."""
+        while True:
+            page = self.queue_get(pages)
+            if page is _DONE:
+                return
+
+            statuses = list(
+                executor.map(lambda mapping: self.pages_status(mapping[1], mapping[2]), page)
+            )
 
-            print(f"  ✓ Deleted {deleted_count}/{len(keys_to_delete)} keys")
+            # Only a definite 404 makes a mapping stale; errors and any other
+            # status keep it, as the repository may still exist, but count as
+            # errors so the run reports partial success
+            page_stale = []
+            seen = set()
+            failed = 0
+            lines = []
+            for (domain, username, repository), status in zip(page, statuses):
+                lines.append(f"📋 {domain} -> {username}/{repository}")
+                if status == 404:
+                    page_stale.append((domain, username, repository))
+                    lines.append("  ❌ Repository no longer has .pages file")
+                elif status == 200:
+                    seen.add((username, repository))
+                    lines.append("  ✓ Repository still has .pages file")
+                else:
+                    failed += 1
+                    lines.append(f"  ⚠️  Check failed (status {status}), keeping mapping")
+
+            if failed:
+                with self.stats_lock:
+                    self.error_count += failed
+            self.mark_seen(seen)
+            self.log("\n".join(lines))
+
+            if page_stale and not self.queue_put(stale, page_stale):
+                return
+
+    def delete_stale(self, stale: queue.Queue):
+        """Deleter stage: delete stale mappings in pipelined chunks of chunk_size."""
+        pending = deque()
+        while True:
+            batch = self.queue_get(stale)
+            if batch is _DONE:
+                break
+            pending.extend(batch)
+
+            while len(pending) >= self.chunk_size:
+                self.record_deletions(
+                    self.delete_domain_mappings(
+                        [pending.popleft() for _ in range(self.chunk_size)]
+                    )
+                )
+
+        if pending and not self.abort.is_set():
+            self.record_deletions(self.delete_domain_mappings(list(pending)))
+
+    def record_deletions(self, result: Tuple[int, int]):
+        """Add a delete_domain_mappings() result to the run's counters."""
+        deleted, failed = result
+        with self.stats_lock:
+            self.cleaned_domains += deleted
+            self.error_count += failed
 
     def scan_and_clean(self) -> Tuple[int, int, int]:
         """
         Scan Redis for custom domain mappings and clean up stale entries.
 
+        SCAN/MGET, the Forgejo .pages checks and the deletes run as three
+        pipelined stages connected by bounded queues, so their latencies
+        overlap while memory use stays capped by the queue sizes.
+
         Returns:
             Tuple of (total_domains, cleaned_domains, error_count)
         """
@@ -135,53 +663,62 @@ class CacheReaper:
         else:
             print("")
 
-        total_domains = 0
-        cleaned_domains = 0
-        error_count = 0
-
-        # Scan for all custom_domain:* keys
-        cursor = 0
-        pattern = "custom_domain:*"
-
-        while True:
-            cursor, keys = self.redis_client.scan(
-                cursor=cursor, match=pattern, count=100
+        self.total_domains = 0
+        self.cleaned_domains = 0
+        self.error_count = 0
+        self.stage_error = None
+        self.abort = threading.Event()
+        self.start_time = time.monotonic()
+
+        pages = queue.Queue(maxsize=PAGE_QUEUE_SIZE)
+        stale = queue.Queue(maxsize=PAGE_QUEUE_SIZE)
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+
+        # One producer per server, so cluster primaries are scanned in parallel
+        producers = [
+            threading.Thread(
+                target=self.run_stage,
+                args=(self.produce_mappings, client, cursor_key, pages),
+                daemon=True,
             )
+            for client, cursor_key in self.scan_clients()
+        ]
+        checker = threading.Thread(
+            target=self.run_stage,
+            args=(self.check_mappings, pages, stale, executor),
+            daemon=True,
+        )
+        deleter = threading.Thread(
+            target=self.run_stage, args=(self.delete_stale, stale), daemon=True
+        )
 
-            for key in keys:
-                total_domains += 1
-                # Extract domain from key (remove "custom_domain:" prefix)
-                domain = key[len("custom_domain:") :]
-
-                # Get the repository mapping
-                value = self.redis_client.get(key)
-                if not value:
-                    print(f"⚠️  {domain}: No value found (skipping)")
-                    error_count += 1
-                    continue
-
-                # Parse username:repository
-                repo_tuple = self.parse_repo_mapping(value)
-                if not repo_tuple:
-                    print(f"⚠️  {domain}: Invalid mapping format '{value}' (skipping)")
-                    error_count += 1
-                    continue
-
-                username, repository = repo_tuple
-                print(f"📋 {domain} -> {username}/{repository}")
-
-                # Check if repository still has .pages file
-                if not self.has_pages_file(username, repository):
-                    print(f"  ❌ Repository no longer has .pages file")
-                    self.delete_domain_mappings(domain, username, repository)
-                    cleaned_domains += 1
-                else:
-                    print(f"  ✓ Repository still has .pages file")
-
-            if cursor == 0:
-                break
-
-        return total_domains, cleaned_domains, error_count
+        try:
+            for thread in [*producers, checker, deleter]:
+                thread.start()
+
+            # Signal end of stream to each stage once the ones feeding it are done
+            self.wait_for(producers)
+            self.queue_put(pages, _DONE)
+            self.wait_for([checker])
+            self.queue_put(stale, _DONE)
+            self.wait_for([deleter])
+        finally:
+            # Stop the stages early on interrupt; a no-op after a clean run
+            self.abort.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.flush_log()
+
+        if self.stage_error is not None:
+            raise self.stage_error
+
+        return self.total_domains, self.cleaned_domains, self.error_count
+
+    def wait_for(self, threads: List[threading.Thread]):
+        """Wait for pipeline threads to finish, writing buffered output meanwhile."""
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=0.5)
+                self.flush_log()
 
     def print_summary(self, total: int, cleaned: int, errors: int, duration: float):
         """Print summary of reaper run."""
@@ -217,6 +754,19 @@ def main():
         default=os.getenv("REDIS_PASSWORD"),
         help="Redis password (default: $REDIS_PASSWORD)",
     )
+    parser.add_argument(
+        "--redis-protocol",
+        type=int,
+        choices=[2, 3],
+        default=int(os.getenv("REDIS_PROTOCOL", "3")),
+        help="Redis protocol version; use 2 for servers or proxies without RESP3 (default: 3 or $REDIS_PROTOCOL)",
+    )
+    parser.add_argument(
+        "--redis-cluster",
+        action="store_true",
+        default=os.getenv("REDIS_CLUSTER", "").lower() in ("1", "true", "yes"),
+        help="Connect to a Redis Cluster and scan its primaries in parallel (default: $REDIS_CLUSTER)",
+    )
     parser.add_argument(
         "--forgejo-host",
         default=os.getenv("FORGEJO_HOST"),
@@ -233,6 +783,50 @@ def main():
         action="store_true",
         help="Dry run mode - show what would be deleted without actually deleting",
     )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="List every deleted key instead of only per-domain totals",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=CHUNK_SIZE,
+        help=f"Stale domains deleted per pipelined Redis round trip (default: {CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "--scan-count",
+        type=int,
+        default=SCAN_COUNT,
+        help=f"COUNT hint for each Redis SCAN call (default: {SCAN_COUNT})",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=CONCURRENCY,
+        help=f"Forgejo .pages checks to run in parallel (default: {CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--max-scanned",
+        type=int,
+        default=MAX_SCANNED,
+        help=f"Stop scanning after this many domains and resume next run; 0 for no limit (default: {MAX_SCANNED})",
+    )
+    parser.add_argument(
+        "--max-wall-seconds",
+        type=int,
+        default=MAX_WALL_SECONDS,
+        help=f"Stop scanning after this many seconds and resume next run; 0 for no limit (default: {MAX_WALL_SECONDS})",
+    )
+    parser.add_argument(
+        "--recheck-interval",
+        type=int,
+        default=RECHECK_INTERVAL,
+        help=(
+            "Seconds to skip re-checking a repository confirmed to have a .pages file; "
+            f"0 checks every repository on every run (default: {RECHECK_INTERVAL})"
+        ),
+    )
 
     args = parser.parse_args()
 
@@ -241,9 +835,18 @@ def main():
         redis_host=args.redis_host,
         redis_port=args.redis_port,
         redis_password=args.redis_password,
+        redis_protocol=args.redis_protocol,
+        redis_cluster=args.redis_cluster,
         forgejo_host=args.forgejo_host,
         forgejo_token=args.forgejo_token,
         dry_run=args.dry_run,
+        verbose=args.verbose,
+        chunk_size=args.chunk_size,
+        scan_count=args.scan_count,
+        concurrency=args.concurrency,
+        recheck_interval=args.recheck_interval,
+        max_scanned=args.max_scanned,
+        max_wall_seconds=args.max_wall_seconds,
     )
 
     # Test Redis connection
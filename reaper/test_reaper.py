@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Tests for the cache reaper, run against an in-memory fakeredis server.
+
+Usage:
+    pip install -r requirements-dev.txt
+    python -m unittest test_reaper
+"""
+
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+import fakeredis
+
+import reaper
+
+
+def register_domain(client, domain: str, username: str, repository: str):
+    """Write the keys the plugin stores for a custom domain."""
+    client.set(f"custom_domain:{domain}", f"{username}:{repository}")
+    client.set(f"{username}:{repository}", domain)
+    prefix = "traefik/http/routers/custom-" + reaper.sanitize_domain_name(domain)
+    for suffix in reaper.CacheReaper.TRAEFIK_SUFFIXES:
+        client.set(prefix + suffix, "value")
+
+
+class ReaperTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = fakeredis.FakeServer()
+        self.statuses = {}
+        self.checked = []
+
+    def make_reaper(self, **kwargs) -> reaper.CacheReaper:
+        """Create a reaper talking to the fake server, with a fake Forgejo."""
+        kwargs.setdefault("max_wall_seconds", 0)
+        with mock.patch.object(
+            reaper.redis,
+            "Redis",
+            lambda **_: fakeredis.FakeRedis(server=self.server, decode_responses=True),
+        ):
+            cache_reaper = reaper.CacheReaper(
+                redis_host="localhost",
+                redis_port=6379,
+                redis_password=None,
+                forgejo_host="https://git.example.com",
+                forgejo_token=None,
+                **kwargs,
+            )
+        cache_reaper.fetch_pages_status = self.fetch_pages_status
+        return cache_reaper
+
+    def fetch_pages_status(self, username: str, repository: str):
+        self.checked.append((username, repository))
+        return self.statuses.get((username, repository), 200)
+
+    def run_reaper(self, cache_reaper: reaper.CacheReaper):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return cache_reaper.scan_and_clean()
+
+
+class TestScanAndClean(ReaperTestCase):
+    def test_deletes_stale_and_keeps_live_domains(self):
+        cache_reaper = self.make_reaper()
+        client = cache_reaper.redis_client
+        register_domain(client, "stale.example.org", "alice", "gone")
+        register_domain(client, "live.example.org", "bob", "site")
+        self.statuses[("alice", "gone")] = 404
+
+        self.assertEqual(self.run_reaper(cache_reaper), (2, 1, 0))
+
+        stale_keys = cache_reaper.domain_keys("stale.example.org", "alice", "gone")
+        live_keys = cache_reaper.domain_keys("live.example.org", "bob", "site")
+        self.assertEqual(client.exists(*stale_keys), 0)
+        self.assertEqual(client.exists(*live_keys), len(live_keys))
+        self.assertIsNotNone(client.get(f"{reaper.LAST_SEEN_PREFIX}bob:site"))
+
+    def test_dry_run_deletes_nothing(self):
+        cache_reaper = self.make_reaper(dry_run=True)
+        client = cache_reaper.redis_client
+        register_domain(client, "stale.example.org", "alice", "gone")
+        self.statuses[("alice", "gone")] = 404
+
+        self.assertEqual(self.run_reaper(cache_reaper), (1, 1, 0))
+
+        keys = cache_reaper.domain_keys("stale.example.org", "alice", "gone")
+        self.assertEqual(client.exists(*keys), len(keys))
+
+    def test_skips_domain_re_registered_since_scan(self):
+        cache_reaper = self.make_reaper()
+        client = cache_reaper.redis_client
+        register_domain(client, "moved.example.org", "alice", "old")
+
+        def fetch_pages_status(username, repository):
+            # The domain moves to another repository while it is being checked
+            client.set("custom_domain:moved.example.org", "alice:new")
+            return 404
+
+        cache_reaper.fetch_pages_status = fetch_pages_status
+
+        self.assertEqual(self.run_reaper(cache_reaper), (1, 0, 0))
+        self.assertEqual(client.get("custom_domain:moved.example.org"), "alice:new")
+        self.assertEqual(client.get("alice:old"), "moved.example.org")
+
+    def test_failed_checks_keep_mapping_and_count_as_errors(self):
+        cache_reaper = self.make_reaper()
+        client = cache_reaper.redis_client
+        register_domain(client, "flaky.example.org", "alice", "site")
+        self.statuses[("alice", "site")] = 500
+
+        self.assertEqual(self.run_reaper(cache_reaper), (1, 0, 1))
+        self.assertEqual(client.get("custom_domain:flaky.example.org"), "alice:site")
+
+    def test_stage_exception_is_raised(self):
+        cache_reaper = self.make_reaper()
+        register_domain(cache_reaper.redis_client, "example.org", "alice", "site")
+
+        def fetch_pages_status(username, repository):
+            raise RuntimeError("checker failed")
+
+        cache_reaper.fetch_pages_status = fetch_pages_status
+
+        with self.assertRaisesRegex(RuntimeError, "checker failed"):
+            self.run_reaper(cache_reaper)
+
+
+class TestScanBudget(ReaperTestCase):
+    def test_saves_and_resumes_cursor(self):
+        domains = {f"d{i}.example.org": ("user", f"repo{i}") for i in range(50)}
+        client = self.make_reaper().redis_client
+        for domain, (username, repository) in domains.items():
+            register_domain(client, domain, username, repository)
+
+        runs = 0
+        while True:
+            cache_reaper = self.make_reaper(max_scanned=10, scan_count=5, recheck_interval=0)
+            total, _, _ = self.run_reaper(cache_reaper)
+            runs += 1
+            if client.get(reaper.CURSOR_KEY) is None:
+                break
+            self.assertGreaterEqual(total, 10)
+            self.assertLess(runs, len(domains))
+
+        self.assertGreater(runs, 1)
+        self.assertEqual(set(self.checked), set(domains.values()))
+
+    def test_ignores_invalid_saved_cursor(self):
+        cache_reaper = self.make_reaper()
+        client = cache_reaper.redis_client
+        register_domain(client, "example.org", "alice", "site")
+        client.set(reaper.CURSOR_KEY, "not-a-cursor")
+
+        self.assertEqual(self.run_reaper(cache_reaper), (1, 0, 0))
+        self.assertIsNone(client.get(reaper.CURSOR_KEY))
+
+
+if __name__ == "__main__":
+    unittest.main()